@@ -0,0 +1,70 @@
+import re
+
+# Lines that usually start a new resume/portfolio section.
+SECTION_KEYWORDS = (
+    '경력', '경험', '학력', '프로젝트', '기술', '스킬', '자격', '수상', '활동', '자기소개', '소개', '포트폴리오',
+    'experience', 'education', 'project', 'skill', 'certificat', 'award', 'summary', 'profile', 'portfolio',
+)
+
+_BULLET_PATTERN = re.compile(r'^\s*(#{1,6}\s|\d+[.)]\s|[■□●○▶◆◇\[【])')
+
+
+def _is_heading(line):
+    stripped = line.strip()
+    if not stripped or len(stripped) > 40:
+        return False
+    if _BULLET_PATTERN.match(stripped) or stripped.endswith(':'):
+        return True
+    lowered = stripped.lower()
+    return any(lowered.startswith(keyword) for keyword in SECTION_KEYWORDS)
+
+
+def split_sections(text):
+    """Splits text at blank-line-separated headings and section keywords, keeping each heading with its body."""
+    sections = []
+    current = []
+    previous_blank = True
+    for line in text.splitlines():
+        if _is_heading(line) and (previous_blank or _BULLET_PATTERN.match(line.strip())) and current:
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+        previous_blank = not line.strip()
+    if current:
+        sections.append("\n".join(current).strip())
+    return [section for section in sections if section]
+
+
+def _split_oversized(section, max_chars):
+    # Fall back to line boundaries, then hard cuts, for sections longer than one chunk.
+    pieces = []
+    current = ""
+    for line in section.splitlines():
+        while len(line) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + len(line) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_into_chunks(text, max_chars=12000):
+    """Packs whole sections into chunks of at most max_chars, so a section is rarely cut in half."""
+    chunks = []
+    current = ""
+    for section in split_sections(text):
+        for piece in ([section] if len(section) <= max_chars else _split_oversized(section, max_chars)):
+            if current and len(current) + len(piece) + 2 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
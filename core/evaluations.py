@@ -0,0 +1,82 @@
+import os
+import json
+import pandas as pd
+
+CSV_PATH = os.path.join('data', 'csv', 'resume_evaluations.csv')
+
+
+def build_evaluation_record(payload, evaluation_result, blob_hashes):
+    """Flattens an LLM evaluation into the row stored in resume_evaluations.csv."""
+    return {
+        'submission_id': payload['submission_id'],
+        'job_id': payload['job_id'],
+        'job_title': payload['job_title'],
+        'applicant_name': payload['applicant_name'],
+        'total_score': evaluation_result.get('total_score'),
+        'scores': json.dumps(evaluation_result.get('scores', {}), ensure_ascii=False),
+        'strengths': evaluation_result.get('strengths'),
+        'weaknesses': evaluation_result.get('weaknesses'),
+        'interview_questions': "; ".join(evaluation_result.get('interview_questions', [])),
+        'pdf_path': None,
+        'pdf_blobs': ";".join(blob_hashes),
+        'submission_date': pd.Timestamp.now()
+    }
+
+
+def append_evaluation(new_data, csv_path=CSV_PATH):
+    os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+    df = pd.read_csv(csv_path) if os.path.exists(csv_path) else pd.DataFrame()
+    df_new = pd.DataFrame([new_data])
+    df_combined = pd.concat([df, df_new], ignore_index=True)
+    df_combined.to_csv(csv_path, index=False, encoding='utf-8-sig')
+
+
+# Columns needed for the applicant listing; long text columns are only read for opened rows.
+SUMMARY_COLUMNS = ['submission_id', 'job_id', 'applicant_name', 'total_score', 'scores', 'submission_date']
+
+
+def load_evaluation_summaries(csv_path=CSV_PATH):
+    """Reads only the slim listing columns of resume_evaluations.csv."""
+    df = pd.read_csv(csv_path, usecols=lambda col: col in SUMMARY_COLUMNS)
+    df['total_score'] = pd.to_numeric(df['total_score'], errors='coerce')
+    df['submission_date'] = pd.to_datetime(df['submission_date'], errors='coerce')
+    return df
+
+
+def filter_applicants(summaries, job_id, name_query="", min_score=None):
+    """Applies the listing filters server-side so only matching rows reach the browser."""
+    df = summaries[summaries['job_id'] == job_id]
+    if name_query:
+        df = df[df['applicant_name'].astype(str).str.contains(name_query, case=False, regex=False, na=False)]
+    if min_score is not None:
+        df = df[df['total_score'] >= min_score]
+    return df
+
+
+def paginate_applicants(filtered, sort_by='total_score', ascending=False, page=1, page_size=20):
+    """Sorts the filtered listing and returns one page with per-criterion score columns."""
+    df = filtered.sort_values(sort_by, ascending=ascending, kind='stable', na_position='last')
+    start = (page - 1) * page_size
+    page_df = df.iloc[start:start + page_size].copy()
+
+    # Expand per-criterion scores only for the rows on this page.
+    criterion_scores = []
+    for scores in page_df['scores']:
+        try:
+            criterion_scores.append(json.loads(scores))
+        except (json.JSONDecodeError, TypeError):
+            criterion_scores.append({})
+    scores_df = pd.DataFrame(criterion_scores, index=page_df.index)
+    return pd.concat([page_df.drop(columns=['scores']), scores_df], axis=1)
+
+
+def load_evaluation_details(submission_ids, csv_path=CSV_PATH, chunksize=1000):
+    """Streams the CSV in chunks and returns full rows for the given submissions, in the given order."""
+    wanted = set(submission_ids)
+    if not wanted:
+        return []
+    details = {}
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        for record in chunk[chunk['submission_id'].isin(wanted)].to_dict('records'):
+            details[record['submission_id']] = record
+    return [details[submission_id] for submission_id in submission_ids if submission_id in details]
@@ -0,0 +1,24 @@
+import os
+
+
+def file_signature(path):
+    """Returns the file's mtime, or None if it does not exist.
+
+    Cached loaders take this as an extra argument so their cache entry changes whenever the
+    file does; pair it with max_entries=1 so stale entries are evicted.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def directory_signature(directory):
+    """Like file_signature, for every file directly inside a directory."""
+    if not os.path.exists(directory):
+        return ()
+    return tuple(
+        (entry.name, entry.stat().st_mtime_ns)
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name)
+        if entry.is_file()
+    )
@@ -0,0 +1,362 @@
+import os
+import json
+import asyncio
+import tomllib
+from functools import lru_cache
+
+from core import tracing
+from core.fs import file_signature
+from core.chunking import split_into_chunks
+
+SECRETS_PATH = os.path.join('.streamlit', 'secrets.toml')
+
+MODEL_NAMES = {
+    "GEMINI": 'gemini-2.5-pro',
+    "OPENAI": "gpt-5",
+}
+
+# Lighter models for adaptation-style calls (e.g. generation from a similar past posting).
+FAST_MODEL_NAMES = {
+    "GEMINI": 'gemini-2.5-flash',
+    "OPENAI": "gpt-5-mini",
+}
+
+# Resumes longer than this are evaluated with the chunked map-reduce mode in 'auto' mode.
+LONG_DOCUMENT_CHARS = int(os.environ.get("LONG_DOCUMENT_CHARS", "30000"))
+CHUNK_CHARS = int(os.environ.get("CHUNK_CHARS", "12000"))
+MAP_CONCURRENCY = int(os.environ.get("MAP_CONCURRENCY", "4"))
+MAP_RETRIES = int(os.environ.get("MAP_RETRIES", "2"))
+MAX_EVIDENCE_PER_CRITERION = 12
+
+EVALUATION_MODE_AUTO = 'auto'
+EVALUATION_MODE_SINGLE = 'single'
+EVALUATION_MODE_CHUNKED = 'chunked'
+
+CONFIG_ENV_NAMES = ("LLM_PROVIDER", "GOOGLE_API_KEY", "GEMINI_API_KEY", "OPENAI_API_KEY")
+
+SAFETY_SETTINGS = {
+    'HATE': 'BLOCK_NONE',
+    'HARASSMENT': 'BLOCK_NONE',
+    'SEXUAL': 'BLOCK_NONE',
+    'DANGEROUS': 'BLOCK_NONE'
+}
+
+
+class LLMError(Exception):
+    """Raised when the LLM call fails or returns something that is not usable JSON."""
+
+
+def _load_secrets():
+    # The worker runs outside Streamlit, so .streamlit/secrets.toml is read directly.
+    if not os.path.exists(SECRETS_PATH):
+        return {}
+    with open(SECRETS_PATH, 'rb') as f:
+        return tomllib.load(f)
+
+
+def _get_setting(secrets, *names):
+    for name in names:
+        value = os.environ.get(name) or secrets.get(name)
+        if value:
+            return value
+    return None
+
+
+def resolve_llm_config():
+    """Resolves (provider, api_key, error_messages) from environment variables, then secrets.toml."""
+    secrets = _load_secrets()
+    provider = (_get_setting(secrets, "LLM_PROVIDER") or "GEMINI").upper()
+    error_messages = []
+    api_key = None
+
+    if provider == "GEMINI":
+        api_key = _get_setting(secrets, "GOOGLE_API_KEY", "GEMINI_API_KEY")
+        if not api_key:
+            error_messages.append("Gemini API 키가 설정되지 않았습니다. 환경 변수 또는 .streamlit/secrets.toml 파일을 확인해주세요.")
+    elif provider == "OPENAI":
+        api_key = _get_setting(secrets, "OPENAI_API_KEY")
+        if not api_key:
+            error_messages.append("OpenAI API 키가 설정되지 않았습니다. 환경 변수 또는 .streamlit/secrets.toml 파일을 확인해주세요.")
+    else:
+        error_messages.append(f"지원하지 않는 LLM_PROVIDER입니다: {provider}. 'GEMINI' 또는 'OPENAI' 중에서 선택해주세요.")
+
+    return provider, api_key, error_messages
+
+
+def build_evaluation_prompt(job_details, resume_text):
+    llm_prompt = job_details['prompt']
+    evaluation_criteria = job_details['evaluation_criteria']
+
+    return f'''"{llm_prompt}
+
+    **평가 항목:**
+    {json.dumps(evaluation_criteria, ensure_ascii=False, indent=4)}
+
+    **지원자 이력서:**
+    ---
+    {resume_text}
+    ---
+
+    **요구사항:**
+    위 평가 항목과 채용 공고를 바탕으로 지원자의 이력서를 평가해주세요.
+    각 평가 항목에 대한 점수, 총점, 강점, 약점, 그리고 면접 질문 10가지를 생성해야 합니다.
+
+    **출력 형식:**
+    반드시 아래와 같은 JSON 형식으로만 응답해야 합니다. 다른 설명은 추가하지 마세요.
+
+    ```json
+    {{
+        "scores": {{
+            "<평가 항목 1>": <점수1>,
+            "<평가 항목 2>": <점수2>
+        }},
+        "total_score": <총점 (숫자만, scores의 합계)>,
+        "strengths": "<강점 요약>",
+        "weaknesses": "<약점 요약>",
+        "interview_questions": [
+            "면접 질문 1",
+            "면접 질문 2",
+            "면접 질문 3",
+            "면접 질문 4",
+            "면접 질문 5",
+            "면접 질문 6",
+            "면접 질문 7",
+            "면접 질문 8",
+            "면접 질문 9",
+            "면접 질문 10"
+        ]
+    }}
+    ```
+    '''
+
+
+def build_evidence_prompt(job_details, chunk, chunk_index, chunk_count):
+    criteria = list(job_details['evaluation_criteria'].keys())
+    return f'''당신은 채용 평가를 돕는 보조자입니다. 아래는 한 지원자의 이력서/포트폴리오 중 일부({chunk_index + 1}/{chunk_count})입니다.
+    점수를 매기지 말고, 각 평가 항목과 관련된 근거만 원문에 충실하게 짧은 문장으로 추출하세요.
+    관련 근거가 없는 항목은 빈 배열로 두세요.
+
+    **평가 항목:**
+    {json.dumps(criteria, ensure_ascii=False)}
+
+    **문서 일부:**
+    ---
+    {chunk}
+    ---
+
+    **출력 형식:**
+    반드시 아래와 같은 JSON 형식으로만 응답해야 합니다. 다른 설명은 추가하지 마세요.
+
+    ```json
+    {{
+        "evidence": {{
+            "<평가 항목 1>": ["근거 1", "근거 2"],
+            "<평가 항목 2>": []
+        }},
+        "profile": "<이 부분에서 드러나는 지원자 기본 정보(경력 연차, 직무 등) 한두 문장, 없으면 빈 문자열>"
+    }}
+    ```
+    '''
+
+
+def merge_evidence(job_details, partial_results):
+    """Reduces per-chunk evidence into a compact, deduplicated text used in place of the full resume."""
+    criteria = list(job_details['evaluation_criteria'].keys())
+    evidence = {criterion: [] for criterion in criteria}
+    profiles = []
+    for result in partial_results:
+        for criterion, items in (result.get('evidence') or {}).items():
+            if criterion not in evidence or not isinstance(items, list):
+                continue
+            for item in items:
+                item = str(item).strip()
+                if item and item not in evidence[criterion] and len(evidence[criterion]) < MAX_EVIDENCE_PER_CRITERION:
+                    evidence[criterion].append(item)
+        profile = str(result.get('profile') or '').strip()
+        if profile and profile not in profiles:
+            profiles.append(profile)
+
+    lines = ["(긴 문서 모드: 아래는 지원자의 전체 이력서/포트폴리오에서 평가 항목별로 추출한 근거 요약입니다.)"]
+    if profiles:
+        lines.append("\n[지원자 개요]")
+        lines.extend(f"- {profile}" for profile in profiles)
+    for criterion, items in evidence.items():
+        lines.append(f"\n[{criterion}]")
+        if items:
+            lines.extend(f"- {item}" for item in items)
+        else:
+            lines.append("- 관련 근거 없음")
+    return "\n".join(lines)
+
+
+def _parse_json(text):
+    cleaned_response = text.strip().replace("```json", "").replace("```", "")
+    if not cleaned_response:
+        raise LLMError(f"API 응답에서 JSON 데이터를 찾을 수 없습니다. 수신된 원본 텍스트: {text}")
+    try:
+        return json.loads(cleaned_response)
+    except json.JSONDecodeError as e:
+        raise LLMError(f"API 응답을 JSON으로 파싱하는 데 실패했습니다: {e} / 파싱에 실패한 텍스트: {cleaned_response}")
+
+
+def _gemini_json(response):
+    if response.prompt_feedback and response.prompt_feedback.block_reason:
+        raise LLMError(f"Gemini API 요청이 안전 설정에 의해 차단되었습니다. 이유: {response.prompt_feedback.block_reason}")
+    if not response.text:
+        raise LLMError(f"Gemini API로부터 빈 응답을 받았습니다. 이력서 내용이나 API 설정에 문제가 있을 수 있습니다. 전체 API 응답: {response}")
+    return _parse_json(response.text)
+
+
+def _openai_json(response):
+    content = response.choices[0].message.content
+    if not content:
+        raise LLMError("OpenAI API로부터 빈 응답을 받았습니다.")
+    return _parse_json(content)
+
+
+def _openai_messages(prompt):
+    return [
+        {"role": "system", "content": "You are a helpful assistant designed to output JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+class LLMProvider:
+    """Resolved LLM configuration plus lazily built SDK clients, shared by every rerun of every page.
+
+    The Gemini/OpenAI SDKs are only imported when the first request is made, so pages that never
+    call an LLM (or reruns that do not) pay neither the import nor the client construction cost.
+    """
+
+    def __init__(self, name, api_key, error_messages):
+        self.name = name
+        self.api_key = api_key
+        self.error_messages = error_messages
+        self._gemini_models = {}
+        self._openai_client = None
+        self._openai_async_client = None
+
+    def _gemini_model(self, model_name):
+        if model_name not in self._gemini_models:
+            import google.generativeai as genai
+            if not self._gemini_models:
+                genai.configure(api_key=self.api_key)
+            self._gemini_models[model_name] = genai.GenerativeModel(model_name)
+        return self._gemini_models[model_name]
+
+    def _openai(self, use_async=False):
+        import openai
+        if use_async:
+            if self._openai_async_client is None:
+                self._openai_async_client = openai.AsyncOpenAI(api_key=self.api_key)
+            return self._openai_async_client
+        if self._openai_client is None:
+            self._openai_client = openai.OpenAI(api_key=self.api_key)
+        return self._openai_client
+
+    def generate_json(self, prompt, model_name=None):
+        """Sends the prompt and returns the parsed JSON response, raising LLMError on failure."""
+        model_name = model_name or MODEL_NAMES[self.name]
+        try:
+            if self.name == "GEMINI":
+                with tracing.span('llm.request', model=model_name):
+                    response = self._gemini_model(model_name).generate_content(prompt, safety_settings=SAFETY_SETTINGS)
+                with tracing.span('llm.parse_json'):
+                    return _gemini_json(response)
+            with tracing.span('llm.request', model=model_name):
+                response = self._openai().chat.completions.create(
+                    model=model_name,
+                    messages=_openai_messages(prompt),
+                    response_format={"type": "json_object"}
+                )
+            with tracing.span('llm.parse_json'):
+                return _openai_json(response)
+        except LLMError:
+            raise
+        except Exception as e:
+            raise LLMError(f"{self.name} API 호출 중 오류가 발생했습니다: {e}")
+
+    async def generate_json_async(self, prompt, model_name=None, semaphore=None):
+        """Async variant used by the background worker so many calls can wait on the network at once.
+
+        When a semaphore is given it is held only for this one call, so a semaphore shared by every
+        task bounds the number of requests in flight across the worker.
+        """
+        if semaphore is None:
+            return await self._generate_json_async(prompt, model_name)
+        with tracing.span('llm.slot_wait'):
+            await semaphore.acquire()
+        try:
+            return await self._generate_json_async(prompt, model_name)
+        finally:
+            semaphore.release()
+
+    async def _generate_json_async(self, prompt, model_name):
+        model_name = model_name or MODEL_NAMES[self.name]
+        try:
+            if self.name == "GEMINI":
+                with tracing.span('llm.request', model=model_name):
+                    response = await self._gemini_model(model_name).generate_content_async(prompt, safety_settings=SAFETY_SETTINGS)
+                with tracing.span('llm.parse_json'):
+                    return _gemini_json(response)
+            with tracing.span('llm.request', model=model_name):
+                response = await self._openai(use_async=True).chat.completions.create(
+                    model=model_name,
+                    messages=_openai_messages(prompt),
+                    response_format={"type": "json_object"}
+                )
+            with tracing.span('llm.parse_json'):
+                return _openai_json(response)
+        except LLMError:
+            raise
+        except Exception as e:
+            raise LLMError(f"{self.name} API 호출 중 오류가 발생했습니다: {e}")
+
+    async def evaluate_resume_async(self, job_details, resume_text, mode=EVALUATION_MODE_AUTO, semaphore=None):
+        if mode == EVALUATION_MODE_CHUNKED or (mode == EVALUATION_MODE_AUTO and len(resume_text) > LONG_DOCUMENT_CHARS):
+            resume_text = await self.extract_evidence_async(job_details, resume_text, semaphore)
+        with tracing.span('llm.prompt_build', resume_chars=len(resume_text)):
+            prompt = build_evaluation_prompt(job_details, resume_text)
+        return await self.generate_json_async(prompt, semaphore=semaphore)
+
+    async def extract_evidence_async(self, job_details, resume_text, semaphore=None):
+        """Map step of the long-document mode: extracts per-criterion evidence from each chunk in parallel
+        with the lighter model, then merges it into a compact text for the final scoring call.
+
+        A chunk that still fails after MAP_RETRIES retries fails the whole evaluation: scoring without
+        its evidence would silently penalize the applicant for criteria covered only in that chunk.
+        MAP_CONCURRENCY caps this document's fan-out; `semaphore` is the caller's overall call limit.
+        """
+        chunks = split_into_chunks(resume_text, CHUNK_CHARS)
+        map_semaphore = asyncio.Semaphore(MAP_CONCURRENCY)
+
+        async def extract(index, chunk):
+            prompt = build_evidence_prompt(job_details, chunk, index, len(chunks))
+            for attempt in range(MAP_RETRIES + 1):
+                try:
+                    async with map_semaphore:
+                        with tracing.span('llm.map_chunk', chunk_index=index, chunk_chars=len(chunk), attempt=attempt):
+                            return await self.generate_json_async(prompt, model_name=FAST_MODEL_NAMES[self.name], semaphore=semaphore)
+                except LLMError:
+                    if attempt == MAP_RETRIES:
+                        raise
+                    await asyncio.sleep(2 ** attempt)
+
+        results = await asyncio.gather(*(extract(i, chunk) for i, chunk in enumerate(chunks)), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise LLMError(f"긴 문서 모드에서 {len(chunks)}개 구간 중 {len(errors)}개 구간의 근거 추출에 실패했습니다: {errors[0]}")
+
+        with tracing.span('llm.reduce', chunk_count=len(chunks)):
+            return merge_evidence(job_details, results)
+
+
+@lru_cache(maxsize=1)
+def _build_llm_provider(config_key):
+    return LLMProvider(*resolve_llm_config())
+
+
+def get_llm_provider():
+    """Returns the process-wide LLMProvider; secrets.toml is only re-parsed when it changes."""
+    config_key = (file_signature(SECRETS_PATH),) + tuple(os.environ.get(name) for name in CONFIG_ENV_NAMES)
+    return _build_llm_provider(config_key)
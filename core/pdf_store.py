@@ -0,0 +1,245 @@
+"""Content-addressed storage for resume PDFs.
+
+Each uploaded file is stored once under data/pdf/blobs/<sha256[:2]>/<sha256>.pdf and evaluation
+records reference it through the 'pdf_blobs' column (';'-separated hashes, in upload order).
+Multi-file submissions are merged on demand when viewed instead of being stored twice.
+Blobs only referenced by old evaluations can be moved to an lzma-compressed archive tier,
+and blobs no record references any more are reclaimed by the GC command:
+
+    python -m core.pdf_store gc
+    python -m core.pdf_store archive --days 180
+    python -m core.pdf_store migrate
+"""
+import os
+import io
+import lzma
+import time
+import hashlib
+import argparse
+from collections import Counter
+
+import pandas as pd
+
+from core.evaluations import CSV_PATH
+
+PDF_DIR = os.path.join('data', 'pdf')
+BLOB_DIR = os.path.join(PDF_DIR, 'blobs')
+ARCHIVE_DIR = os.path.join(PDF_DIR, 'archive')
+
+# Blobs younger than this are never collected: the worker stores blobs before the evaluation row exists.
+GC_GRACE_SECONDS = 60 * 60
+
+
+def _hot_path(blob_hash):
+    return os.path.join(BLOB_DIR, blob_hash[:2], f"{blob_hash}.pdf")
+
+
+def _archive_path(blob_hash):
+    return os.path.join(ARCHIVE_DIR, blob_hash[:2], f"{blob_hash}.pdf.xz")
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def recompress_pdf(data):
+    """Losslessly recompresses page content streams; returns the original bytes if that does not help."""
+    from pypdf import PdfReader, PdfWriter
+
+    try:
+        writer = PdfWriter(clone_from=PdfReader(io.BytesIO(data)))
+        for page in writer.pages:
+            page.compress_content_streams()
+        buffer = io.BytesIO()
+        writer.write(buffer)
+    except Exception:
+        return data
+    compressed = buffer.getvalue()
+    return compressed if len(compressed) < len(data) else data
+
+
+def store_pdf(data, recompress=False):
+    """Stores PDF bytes once and returns their content hash.
+
+    The hash is always taken over the uploaded bytes, so re-uploading the same file deduplicates
+    even when the stored copy was recompressed.
+    """
+    blob_hash = hashlib.sha256(data).hexdigest()
+    for path in (_hot_path(blob_hash), _archive_path(blob_hash)):
+        try:
+            # Restart the GC grace window: the blob may be an orphan about to be referenced again.
+            os.utime(path)
+            return blob_hash
+        except FileNotFoundError:
+            continue
+    _write_atomic(_hot_path(blob_hash), recompress_pdf(data) if recompress else data)
+    return blob_hash
+
+
+def blob_exists(blob_hash):
+    return os.path.exists(_hot_path(blob_hash)) or os.path.exists(_archive_path(blob_hash))
+
+
+def read_blob(blob_hash):
+    hot_path = _hot_path(blob_hash)
+    if os.path.exists(hot_path):
+        with open(hot_path, 'rb') as f:
+            return f.read()
+    with lzma.open(_archive_path(blob_hash), 'rb') as f:
+        return f.read()
+
+
+def parse_blob_refs(value):
+    if not isinstance(value, str) or not value:
+        return []
+    return [blob_hash for blob_hash in value.split(';') if blob_hash]
+
+
+def load_resume_pdf(record):
+    """Returns the PDF bytes for an evaluation record, or None if the file is missing.
+
+    Supports both blob references and the legacy per-submission 'pdf_path' files.
+    """
+    blob_hashes = parse_blob_refs(record.get('pdf_blobs'))
+    if blob_hashes:
+        if not all(blob_exists(blob_hash) for blob_hash in blob_hashes):
+            return None
+        if len(blob_hashes) == 1:
+            return read_blob(blob_hashes[0])
+        from pypdf import PdfMerger
+
+        merger = PdfMerger()
+        for blob_hash in blob_hashes:
+            merger.append(io.BytesIO(read_blob(blob_hash)))
+        buffer = io.BytesIO()
+        merger.write(buffer)
+        merger.close()
+        return buffer.getvalue()
+
+    pdf_path = record.get('pdf_path')
+    if isinstance(pdf_path, str) and os.path.exists(pdf_path):
+        with open(pdf_path, 'rb') as f:
+            return f.read()
+    return None
+
+
+def _read_references(csv_path):
+    if not os.path.exists(csv_path):
+        return pd.DataFrame(columns=['pdf_blobs', 'submission_date'])
+    df = pd.read_csv(csv_path, usecols=lambda col: col in ('pdf_blobs', 'submission_date'))
+    if 'pdf_blobs' not in df.columns:
+        df['pdf_blobs'] = None
+    df['submission_date'] = pd.to_datetime(df['submission_date'], errors='coerce')
+    return df
+
+
+def reference_counts(csv_path=CSV_PATH):
+    """Counts how many evaluation records reference each blob."""
+    counts = Counter()
+    for value in _read_references(csv_path)['pdf_blobs']:
+        counts.update(parse_blob_refs(value))
+    return counts
+
+
+def _iter_blobs(root, suffix):
+    if not os.path.exists(root):
+        return
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(suffix):
+                yield filename[:-len(suffix)], os.path.join(dirpath, filename)
+
+
+def collect_garbage(csv_path=CSV_PATH, dry_run=False):
+    """Deletes blobs (hot and archived) that no evaluation record references. Returns (count, bytes)."""
+    counts = reference_counts(csv_path)
+    cutoff = time.time() - GC_GRACE_SECONDS
+    removed, reclaimed = 0, 0
+    for root, suffix in ((BLOB_DIR, '.pdf'), (ARCHIVE_DIR, '.pdf.xz')):
+        for blob_hash, path in list(_iter_blobs(root, suffix)):
+            if counts[blob_hash] or os.path.getmtime(path) > cutoff:
+                continue
+            reclaimed += os.path.getsize(path)
+            removed += 1
+            if not dry_run:
+                os.remove(path)
+    return removed, reclaimed
+
+
+def archive_old_blobs(days, csv_path=CSV_PATH):
+    """Moves blobs whose newest referencing evaluation is older than `days` to the compressed archive tier."""
+    df = _read_references(csv_path)
+    threshold = pd.Timestamp.now() - pd.Timedelta(days=days)
+    latest = {}
+    for value, submission_date in zip(df['pdf_blobs'], df['submission_date']):
+        for blob_hash in parse_blob_refs(value):
+            if blob_hash not in latest or (pd.notna(submission_date) and submission_date > latest[blob_hash]):
+                latest[blob_hash] = submission_date
+
+    archived = 0
+    for blob_hash, submission_date in latest.items():
+        hot_path = _hot_path(blob_hash)
+        if pd.isna(submission_date) or submission_date >= threshold or not os.path.exists(hot_path):
+            continue
+        with open(hot_path, 'rb') as f:
+            data = f.read()
+        _write_atomic(_archive_path(blob_hash), lzma.compress(data, preset=9))
+        os.remove(hot_path)
+        archived += 1
+    return archived
+
+
+def migrate_legacy_pdfs(csv_path=CSV_PATH, recompress=False):
+    """Moves legacy {submission_id}_{name}.pdf files into blob storage and rewrites their records.
+
+    Rewrites resume_evaluations.csv, so run it while the worker is stopped.
+    """
+    if not os.path.exists(csv_path):
+        return 0
+    df = pd.read_csv(csv_path)
+    if 'pdf_blobs' not in df.columns:
+        df['pdf_blobs'] = None
+    df['pdf_blobs'] = df['pdf_blobs'].astype(object)
+
+    migrated_paths = set()
+    for index, row in df.iterrows():
+        pdf_path = row.get('pdf_path')
+        if parse_blob_refs(row['pdf_blobs']) or not isinstance(pdf_path, str) or not os.path.exists(pdf_path):
+            continue
+        with open(pdf_path, 'rb') as f:
+            df.at[index, 'pdf_blobs'] = store_pdf(f.read(), recompress=recompress)
+        migrated_paths.add(pdf_path)
+
+    if migrated_paths:
+        df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+        for pdf_path in migrated_paths:
+            os.remove(pdf_path)
+    return len(migrated_paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이력서 PDF 저장소 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    gc_parser = subparsers.add_parser("gc", help="참조되지 않는 PDF를 삭제합니다.")
+    gc_parser.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상만 집계합니다.")
+    archive_parser = subparsers.add_parser("archive", help="오래된 지원자의 PDF를 압축 보관 영역으로 옮깁니다.")
+    archive_parser.add_argument("--days", type=int, default=180, help="보관 영역으로 옮길 기준 일수")
+    migrate_parser = subparsers.add_parser("migrate", help="기존 PDF 파일을 해시 기반 저장소로 옮깁니다. (워커 중지 후 실행)")
+    migrate_parser.add_argument("--recompress", action="store_true", help="저장 시 PDF를 재압축합니다.")
+    args = parser.parse_args()
+
+    if args.command == "gc":
+        removed, reclaimed = collect_garbage(dry_run=args.dry_run)
+        print(f"{removed}개 PDF, {reclaimed / 1024 / 1024:.1f} MB {'회수 가능' if args.dry_run else '회수 완료'}")
+    elif args.command == "archive":
+        print(f"{archive_old_blobs(args.days)}개 PDF를 보관 영역으로 옮겼습니다.")
+    elif args.command == "migrate":
+        print(f"{migrate_legacy_pdfs(recompress=args.recompress)}개 PDF를 해시 기반 저장소로 옮겼습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import json
+import math
+import re
+from collections import Counter
+
+JOB_POSTINGS_DIR = os.path.join('data', 'job_postings')
+PROMPTS_DIR = 'prompts'
+
+
+def load_job_postings(job_postings_dir=JOB_POSTINGS_DIR):
+    """Loads every job posting JSON file, keyed by posting id."""
+    if not os.path.exists(job_postings_dir):
+        return {}
+    postings = {}
+    for filename in sorted(os.listdir(job_postings_dir)):
+        if filename.endswith('.json'):
+            file_path = os.path.join(job_postings_dir, filename)
+            with open(file_path, 'r', encoding='utf-8') as f:
+                job_data = json.load(f)
+                postings[job_data['id']] = job_data
+    return postings
+
+
+def load_prompt_templates(prompts_dir=PROMPTS_DIR):
+    """Loads curated prompt templates (prompts/*.txt), keyed by template name."""
+    if not os.path.exists(prompts_dir):
+        return {}
+    templates = {}
+    for filename in sorted(os.listdir(prompts_dir)):
+        if filename.endswith('.txt'):
+            with open(os.path.join(prompts_dir, filename), 'r', encoding='utf-8') as f:
+                templates[os.path.splitext(filename)[0]] = f.read()
+    return templates
+
+
+def _ngrams(text, sizes=(2, 3)):
+    # Character n-grams work for Korean and English alike without a tokenizer.
+    text = re.sub(r'\s+', ' ', text.lower()).strip()
+    grams = Counter()
+    for n in sizes:
+        grams.update(text[i:i + n] for i in range(len(text) - n + 1))
+    return grams
+
+
+class SimilarityIndex:
+    """TF-IDF index over character n-grams of past job posting descriptions."""
+
+    def __init__(self, postings):
+        self.postings = postings
+        counts = {job_id: _ngrams(f"{job['title']}\n{job['description']}") for job_id, job in postings.items()}
+        doc_freq = Counter()
+        for grams in counts.values():
+            doc_freq.update(grams.keys())
+        total = len(counts)
+        self.idf = {gram: math.log((1 + total) / (1 + df)) + 1 for gram, df in doc_freq.items()}
+        self.vectors = {job_id: self._weigh(grams) for job_id, grams in counts.items()}
+
+    def _weigh(self, grams):
+        vector = {gram: count * self.idf.get(gram, 1.0) for gram, count in grams.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {gram: w / norm for gram, w in vector.items()}
+
+    def search(self, text, top_k=3, min_score=0.0):
+        """Returns [(job_id, score)] for the postings most similar to the given text."""
+        query = self._weigh(_ngrams(text))
+        if not query:
+            return []
+        results = []
+        for job_id, vector in self.vectors.items():
+            if len(vector) < len(query):
+                score = sum(w * query.get(gram, 0.0) for gram, w in vector.items())
+            else:
+                score = sum(w * vector.get(gram, 0.0) for gram, w in query.items())
+            if score >= min_score:
+                results.append((job_id, score))
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results[:top_k]
@@ -0,0 +1,27 @@
+import io
+from pypdf import PdfReader
+
+from core import tracing
+from core.pdf_store import store_pdf
+
+
+def prepare_resume(upload_paths, recompress=False, submission_id=None, profile_enabled=False):
+    """Stores each uploaded PDF in the blob store and returns (blob_hashes, extracted_text).
+
+    Multiple uploads are not merged on disk; the viewer merges the blobs on demand.
+    Runs in the worker's process pool, so it must stay a top-level, picklable function,
+    and the submission_id is passed explicitly for tracing.
+    """
+    blob_hashes = []
+    texts = []
+    with tracing.profile('prepare_resume', submission_id, profile_enabled):
+        for index, upload_path in enumerate(upload_paths):
+            with open(upload_path, "rb") as f:
+                data = f.read()
+            with tracing.span('pdf.store', submission_id, file_index=index, size=len(data)):
+                blob_hashes.append(store_pdf(data, recompress=recompress))
+            with tracing.span('pdf.extract_text', submission_id, file_index=index):
+                reader = PdfReader(io.BytesIO(data))
+                texts.append("".join([page.extract_text() or "" for page in reader.pages]))
+    # Keep file boundaries visible so long-document chunking can split between attachments.
+    return blob_hashes, "\n\n".join(texts)
@@ -0,0 +1,173 @@
+import os
+import json
+import sqlite3
+import uuid
+from contextlib import closing
+from datetime import datetime
+
+QUEUE_DB_PATH = os.path.join('data', 'queue.sqlite3')
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+TASK_EVALUATE_RESUME = 'evaluate_resume'
+
+# A task interrupted this many times (e.g. it crashes the worker) is failed instead of requeued.
+MAX_ATTEMPTS = 3
+
+
+def _connect(db_path=QUEUE_DB_PATH):
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    # WAL lets the Streamlit pages poll while the worker writes.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )"""
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created_at)")
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS workers (
+            id TEXT PRIMARY KEY,
+            pid INTEGER NOT NULL,
+            last_seen TEXT NOT NULL
+        )"""
+    )
+    return conn
+
+
+def _now():
+    return datetime.now().isoformat(timespec='milliseconds')
+
+
+def _row_to_task(row):
+    if row is None:
+        return None
+    task = dict(row)
+    task['payload'] = json.loads(task['payload'])
+    task['result'] = json.loads(task['result']) if task['result'] else None
+    return task
+
+
+def enqueue(kind, payload, task_id=None, db_path=QUEUE_DB_PATH):
+    """Adds a task to the queue and returns its id."""
+    task_id = task_id or str(uuid.uuid4())
+    now = _now()
+    with closing(_connect(db_path)) as conn:
+        conn.execute(
+            "INSERT INTO tasks (id, kind, payload, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (task_id, kind, json.dumps(payload, ensure_ascii=False), STATUS_QUEUED, now, now),
+        )
+    return task_id
+
+
+def get_task(task_id, db_path=QUEUE_DB_PATH):
+    with closing(_connect(db_path)) as conn:
+        return _row_to_task(conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone())
+
+
+def list_tasks(limit=20, db_path=QUEUE_DB_PATH):
+    """Returns the most recent tasks, newest first."""
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute("SELECT * FROM tasks ORDER BY created_at DESC, rowid DESC LIMIT ?", (limit,)).fetchall()
+    return [_row_to_task(row) for row in rows]
+
+
+def claim_next(db_path=QUEUE_DB_PATH):
+    """Atomically marks the oldest queued task as running and returns it, or None."""
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT * FROM tasks WHERE status = ? ORDER BY created_at, rowid LIMIT 1", (STATUS_QUEUED,)
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE tasks SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+            (STATUS_RUNNING, _now(), row['id']),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    task = _row_to_task(row)
+    task['status'] = STATUS_RUNNING
+    task['attempts'] += 1
+    return task
+
+
+def complete(task_id, result, db_path=QUEUE_DB_PATH):
+    with closing(_connect(db_path)) as conn:
+        conn.execute(
+            "UPDATE tasks SET status = ?, result = ?, error = NULL, updated_at = ? WHERE id = ?",
+            (STATUS_DONE, json.dumps(result, ensure_ascii=False), _now(), task_id),
+        )
+
+
+def fail(task_id, error, db_path=QUEUE_DB_PATH):
+    with closing(_connect(db_path)) as conn:
+        conn.execute(
+            "UPDATE tasks SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+            (STATUS_FAILED, str(error), _now(), task_id),
+        )
+
+
+def requeue_running(max_attempts=MAX_ATTEMPTS, db_path=QUEUE_DB_PATH):
+    """Puts tasks left running by a worker that died back into the queue.
+
+    Tasks that already used max_attempts are marked failed instead. Returns (requeued_count, failed_tasks).
+    """
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        exhausted = conn.execute(
+            "SELECT * FROM tasks WHERE status = ? AND attempts >= ?", (STATUS_RUNNING, max_attempts)
+        ).fetchall()
+        conn.execute(
+            "UPDATE tasks SET status = ?, error = ?, updated_at = ? WHERE status = ? AND attempts >= ?",
+            (STATUS_FAILED, f"작업 처리 중 워커가 {max_attempts}회 중단되어 실패로 처리했습니다.", _now(), STATUS_RUNNING, max_attempts),
+        )
+        cursor = conn.execute(
+            "UPDATE tasks SET status = ?, updated_at = ? WHERE status = ?",
+            (STATUS_QUEUED, _now(), STATUS_RUNNING),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return cursor.rowcount, [_row_to_task(row) for row in exhausted]
+
+
+def heartbeat(worker_id, db_path=QUEUE_DB_PATH):
+    """Records that the worker is alive so the pages can warn when nobody is processing the queue."""
+    with closing(_connect(db_path)) as conn:
+        conn.execute(
+            "INSERT INTO workers (id, pid, last_seen) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET last_seen = excluded.last_seen",
+            (worker_id, os.getpid(), _now()),
+        )
+
+
+def last_heartbeat(db_path=QUEUE_DB_PATH):
+    """Returns the most recent worker heartbeat as a datetime, or None if no worker ever ran."""
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute("SELECT MAX(last_seen) AS last_seen FROM workers").fetchone()
+    return datetime.fromisoformat(row['last_seen']) if row['last_seen'] else None
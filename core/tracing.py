@@ -0,0 +1,136 @@
+"""Lightweight, switchable per-stage tracing for the submission pipeline.
+
+Enable with TRACE_ENABLED=1. Each span is appended as one JSON line to TRACE_PATH
+(default data/traces/trace.jsonl) with its stage name, submission_id, start time and duration,
+and can be inspected on the '트레이스 확인' page. Once the file exceeds TRACE_MAX_BYTES it is
+rotated to trace.jsonl.1 (one generation is kept), so the history stays bounded.
+When tracing is disabled, span() returns a shared no-op context manager, so instrumented code
+pays only a function call.
+
+TRACE_PROFILE_RATE (0~1) additionally runs cProfile on that fraction of submissions for the
+CPU-heavy stages and writes data/traces/profiles/<submission_id>_<stage>.prof. For sampling
+without instrumentation, attach py-spy to the worker instead (py-spy record --pid <worker pid>);
+stage functions are plain top-level functions so they show up by name.
+"""
+import os
+import json
+import time
+import random
+import cProfile
+import threading
+import contextvars
+from contextlib import contextmanager, nullcontext
+
+TRACE_ENABLED = os.environ.get("TRACE_ENABLED", "").lower() in ("1", "true", "yes")
+TRACE_PATH = os.environ.get("TRACE_PATH", os.path.join('data', 'traces', 'trace.jsonl'))
+ROTATED_TRACE_PATH = f"{TRACE_PATH}.1"
+PROFILE_DIR = os.path.join(os.path.dirname(TRACE_PATH), 'profiles')
+TRACE_PROFILE_RATE = float(os.environ.get("TRACE_PROFILE_RATE", "0") or 0)
+TRACE_MAX_BYTES = int(os.environ.get("TRACE_MAX_BYTES", str(20 * 1024 * 1024)))
+
+_NOOP = nullcontext()
+_write_lock = threading.Lock()
+_submission_id = contextvars.ContextVar('submission_id', default=None)
+
+
+def record_span(name, start, duration_ms, submission_id=None, **attrs):
+    """Appends a finished span. Use directly for intervals measured elsewhere (e.g. queue wait)."""
+    if not TRACE_ENABLED:
+        return
+    record = {
+        'name': name,
+        'submission_id': submission_id or _submission_id.get(),
+        'start': start,
+        'duration_ms': duration_ms,
+        'pid': os.getpid(),
+    }
+    if attrs:
+        record['attrs'] = attrs
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _write_lock:
+        os.makedirs(os.path.dirname(TRACE_PATH), exist_ok=True)
+        # One write per line in append mode keeps lines from different processes intact.
+        with open(TRACE_PATH, 'a', encoding='utf-8') as f:
+            f.write(line)
+            size = f.tell()
+        if size > TRACE_MAX_BYTES:
+            try:
+                os.replace(TRACE_PATH, ROTATED_TRACE_PATH)
+            except FileNotFoundError:
+                # Another process rotated it first.
+                pass
+
+
+@contextmanager
+def _span(name, submission_id, attrs):
+    start = time.time()
+    t0 = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        attrs['error'] = type(e).__name__
+        raise
+    finally:
+        record_span(name, start, (time.perf_counter() - t0) * 1000, submission_id, **attrs)
+
+
+def span(name, submission_id=None, **attrs):
+    """Times the enclosed block as a pipeline stage."""
+    if not TRACE_ENABLED:
+        return _NOOP
+    return _span(name, submission_id, attrs)
+
+
+@contextmanager
+def _submission_context(submission_id):
+    token = _submission_id.set(submission_id)
+    try:
+        yield
+    finally:
+        _submission_id.reset(token)
+
+
+def submission_context(submission_id):
+    """Makes spans opened inside the block (including in asyncio tasks it starts) carry submission_id."""
+    if not TRACE_ENABLED:
+        return _NOOP
+    return _submission_context(submission_id)
+
+
+def should_profile():
+    """Decides once per submission whether its CPU-heavy stages are profiled."""
+    return TRACE_ENABLED and TRACE_PROFILE_RATE > 0 and random.random() < TRACE_PROFILE_RATE
+
+
+@contextmanager
+def _profile(name, submission_id):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{submission_id}_{name}.prof"))
+
+
+def profile(name, submission_id, enabled):
+    """Runs cProfile over the block when this submission was sampled by should_profile()."""
+    if not enabled:
+        return _NOOP
+    return _profile(name, submission_id)
+
+
+def load_traces(trace_path=TRACE_PATH):
+    """Reads all spans from the rotated and the live trace file, skipping partially written lines."""
+    spans = []
+    for path in (f"{trace_path}.1", trace_path):
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return spans
@@ -1,6 +1,6 @@
 import streamlit as st
 import os
-import pandas as pd
+import csv
 
 st.set_page_config(
     page_title="메인 페이지",
@@ -39,11 +39,9 @@ if os.path.exists(job_postings_dir):
 
 num_resumes = 0
 if os.path.exists(csv_path):
-    try:
-        df = pd.read_csv(csv_path)
-        num_resumes = len(df)
-    except pd.errors.EmptyDataError:
-        num_resumes = 0
+    # csv 모듈로 행 수만 셉니다. (대시보드를 위해 pandas를 불러올 필요가 없습니다.)
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        num_resumes = max(sum(1 for _ in csv.reader(f)) - 1, 0)
 
 col1, col2 = st.columns(2)
 col1.metric("📝 등록된 채용 공고 수", f"{num_job_postings} 개")
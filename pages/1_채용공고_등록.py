@@ -2,61 +2,65 @@ import streamlit as st
 import json
 import uuid
 import os
-import google.generativeai as genai
-import openai
+from core.llm import FAST_MODEL_NAMES, LLMError, get_llm_provider
+from core.fs import directory_signature
+from core.postings import JOB_POSTINGS_DIR, PROMPTS_DIR, SimilarityIndex, load_job_postings, load_prompt_templates
 
 st.set_page_config(layout="wide")
 st.title('채용 공고 관리')
 
 # --- LLM Configuration ---
-LLM_PROVIDER = os.environ.get("LLM_PROVIDER").upper()
-if not LLM_PROVIDER:
-    LLM_PROVIDER = st.secrets.get("LLM_PROVIDER").upper()
-
-if not LLM_PROVIDER:
-    LLM_PROVIDER = "GEMINI"
-
-api_key = None
-model = None
-error_messages = []
-
-if LLM_PROVIDER == "GEMINI":
-    # 환경 변수를 우선적으로 확인 (GOOGLE_API_KEY, GEMINI_API_KEY)
-    api_key = os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
-    # 환경 변수가 없는 경우에만 Streamlit secrets에서 가져옴
-    if not api_key:
-        api_key = st.secrets.get("GOOGLE_API_KEY") or st.secrets.get("GEMINI_API_KEY")
-
-    if api_key:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-pro')
-    else:
-        error_messages.append("Gemini API 키가 설정되지 않았습니다. 환경 변수(GOOGLE_API_KEY 또는 GEMINI_API_KEY) 또는 .streamlit/secrets.toml 파일을 확인해주세요.")
-
-elif LLM_PROVIDER == "OPENAI":
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        api_key = st.secrets.get("OPENAI_API_KEY")
-    
-    if api_key:
-        # OpenAI는 모델 객체를 미리 만들지 않고, API 호출 시 모델 이름을 지정합니다.
-        model = "gpt-5" # 사용할 모델
-    else:
-        error_messages.append("OpenAI API 키가 설정되지 않았습니다. 환경 변수(OPENAI_API_KEY) 또는 .streamlit/secrets.toml 파일을 확인해주세요.")
-
-else:
-    error_messages.append(f"지원하지 않는 LLM_PROVIDER입니다: {LLM_PROVIDER}. 'GEMINI' 또는 'OPENAI' 중에서 선택해주세요.")
+# 설정과 클라이언트는 프로세스 단위로 캐시되므로 매 rerun마다 다시 만들지 않습니다.
+llm = get_llm_provider()
+LLM_PROVIDER = llm.name
 
-if error_messages:
-    for msg in error_messages:
+if llm.error_messages:
+    for msg in llm.error_messages:
         st.error(msg)
     st.stop()
 
 st.info(f"현재 사용 중인 LLM: **{LLM_PROVIDER}**")
 
 # --- Utility Functions ---
-def generate_with_llm(job_description):
-    """Calls the selected LLM API to generate evaluation criteria and prompt."""
+SIMILARITY_THRESHOLD = 0.3
+
+@st.cache_resource(max_entries=1)
+def _build_similarity_index(signature):
+    return SimilarityIndex(load_job_postings())
+
+def get_similarity_index():
+    return _build_similarity_index(directory_signature(JOB_POSTINGS_DIR))
+
+@st.cache_data(max_entries=1)
+def _load_prompt_templates(signature):
+    return load_prompt_templates()
+
+def get_prompt_templates():
+    return _load_prompt_templates(directory_signature(PROMPTS_DIR))
+
+def format_criteria_for_input(criteria_dict):
+    return "\n".join([f"{k}:{v}" for k, v in criteria_dict.items()])
+
+def build_reference_section(reference):
+    """Formats a past posting or template as a few-shot example for the generation prompt."""
+    if not reference:
+        return ""
+    section = "\n    **참고 예시 (유사한 기존 공고 또는 프롬프트 템플릿):**\n    ---\n"
+    if reference.get('description'):
+        section += f"    [채용 공고]\n    {reference['description']}\n\n"
+    if reference.get('evaluation_criteria'):
+        section += f"    [evaluation_criteria]\n    {json.dumps(reference['evaluation_criteria'], ensure_ascii=False)}\n\n"
+    if reference.get('prompt'):
+        section += f"    [prompt]\n    {reference['prompt']}\n"
+    section += "    ---\n    위 예시의 구성과 어조를 최대한 재사용하고, 새 채용 공고와 다른 부분만 수정하세요.\n"
+    return section
+
+def generate_with_llm(job_description, reference=None):
+    """Calls the selected LLM API to generate evaluation criteria and prompt.
+
+    When a reference (similar past posting or prompt template) is given, it is sent as a
+    few-shot example and the lighter model is used, since the answer is mostly an adaptation.
+    """
     prompt = f'''당신은 IT 회사 전문 채용 관리자입니다.
     아래 주어진 채용 공고 내용을 분석하여, 지원자의 역량을 평가하기 위한 기준과 LLM 평가자에게 전달할 프롬프트를 생성해야 합니다.
 
@@ -64,7 +68,7 @@ def generate_with_llm(job_description):
     --- 
     {job_description}
     ---
-
+    {build_reference_section(reference)}
     **요구사항:**
     1.  **평가 항목 (evaluation_criteria):**
         - 채용 공고의 핵심 역량을 기반으로 3~5개의 평가 항목을 만드세요.
@@ -88,64 +92,9 @@ def generate_with_llm(job_description):
     ```
     '''
     try:
-        if LLM_PROVIDER == "GEMINI":
-            # Set strict safety settings to prevent blocking
-            safety_settings = {
-                'HATE': 'BLOCK_NONE',
-                'HARASSMENT': 'BLOCK_NONE',
-                'SEXUAL': 'BLOCK_NONE',
-                'DANGEROUS': 'BLOCK_NONE'
-            }
-            response = model.generate_content(prompt, safety_settings=safety_settings)
-
-            # 1. Check for safety feedback
-            if response.prompt_feedback and response.prompt_feedback.block_reason:
-                st.error(f"Gemini API 요청이 안전 설정에 의해 차단되었습니다. 이유: {response.prompt_feedback.block_reason}")
-                return None
-
-            # 2. Check for empty response text
-            if not response.text:
-                st.error("Gemini API로부터 빈 응답을 받았습니다. 이력서 내용이나 API 설정에 문제가 있을 수 있습니다.")
-                st.warning(f"전체 API 응답: {response}") # Log full response for debugging
-                return None
-
-            # 3. Clean and parse JSON
-            cleaned_response = response.text.strip().replace("```json", "").replace("```", "")
-            if not cleaned_response:
-                st.error("API 응답에서 JSON 데이터를 찾을 수 없습니다.")
-                st.warning(f"수신된 원본 텍스트: {response.text}")
-                return None
-                
-            try:
-                return json.loads(cleaned_response)
-            except json.JSONDecodeError as e:
-                st.error(f"API 응답을 JSON으로 파싱하는 데 실패했습니다: {e}")
-                st.warning(f"파싱에 실패한 텍스트: {cleaned_response}")
-                return None
-        
-        elif LLM_PROVIDER == "OPENAI":
-            client = openai.OpenAI(api_key=api_key)
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant designed to output JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"}
-            )
-            content = response.choices[0].message.content
-            if not content:
-                st.error("OpenAI API로부터 빈 응답을 받았습니다.")
-                return None
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError as e:
-                st.error(f"OpenAI API 응답을 JSON으로 파싱하는 데 실패했습니다: {e}")
-                st.warning(f"파싱에 실패한 텍스트: {content}")
-                return None
-
-    except Exception as e:
-        st.error(f"{LLM_PROVIDER} API 호출 중 오류가 발생했습니다: {e}")
+        return llm.generate_json(prompt, model_name=FAST_MODEL_NAMES[LLM_PROVIDER] if reference else None)
+    except LLMError as e:
+        st.error(str(e))
         return None
 
 # --- Initialize Session State ---
@@ -163,14 +112,55 @@ st.header("1. 채용 공고 입력")
 st.session_state.job_title = st.text_input("채용 공고 제목", st.session_state.job_title)
 st.session_state.job_description = st.text_area("채용 공고 내용", st.session_state.job_description, height=300)
 
+# --- Reusable Assets: similar past postings and prompt templates ---
+similar_postings = []
+if st.session_state.job_description.strip():
+    similarity_index = get_similarity_index()
+    similar_postings = [
+        (similarity_index.postings[job_id], score)
+        for job_id, score in similarity_index.search(st.session_state.job_description, top_k=3, min_score=SIMILARITY_THRESHOLD)
+    ]
+
+if similar_postings:
+    st.subheader("🔁 유사한 기존 공고")
+    st.write("기존 공고의 평가 항목과 프롬프트를 바로 불러오거나, 자동 생성 시 참고 예시로 사용할 수 있습니다.")
+    for posting, score in similar_postings:
+        with st.expander(f"{posting['title']} (유사도: {score:.0%})"):
+            st.json(posting['evaluation_criteria'])
+            st.code(posting['prompt'], language='markdown')
+            if st.button("이 공고의 평가 항목과 프롬프트 불러오기", key=f"reuse_{posting['id']}"):
+                st.session_state.evaluation_criteria = format_criteria_for_input(posting['evaluation_criteria'])
+                st.session_state.prompt = posting['prompt']
+                st.rerun()
+
+prompt_templates = get_prompt_templates()
+selected_template = None
+if prompt_templates:
+    st.subheader("📚 프롬프트 템플릿")
+    selected_template = st.selectbox("템플릿 선택", options=[None] + list(prompt_templates.keys()), format_func=lambda x: "선택 안 함" if x is None else x)
+    if selected_template and st.button("템플릿을 LLM 프롬프트에 적용"):
+        st.session_state.prompt = prompt_templates[selected_template]
+        st.rerun()
+
+reference = None
+if similar_postings or selected_template:
+    use_reference = st.checkbox("유사 공고/선택한 템플릿을 참고 예시로 사용하여 빠르게 생성 (경량 모델)", value=True)
+    if use_reference:
+        if similar_postings:
+            reference = dict(similar_postings[0][0])
+        else:
+            reference = {}
+        if selected_template:
+            reference['prompt'] = prompt_templates[selected_template]
+
 if st.button(f"2. 평가 항목 및 프롬프트 자동 생성 ({LLM_PROVIDER})"):
     if not st.session_state.job_description:
         st.error("채용 공고 내용을 입력해주세요.")
     else:
         with st.spinner(f"{LLM_PROVIDER} API를 호출하여 평가 항목과 프롬프트를 생성 중입니다..."):
-            generated_data = generate_with_llm(st.session_state.job_description)
+            generated_data = generate_with_llm(st.session_state.job_description, reference=reference)
             if generated_data:
-                st.session_state.evaluation_criteria = "\n".join([f"{k}:{v}" for k, v in generated_data.get('evaluation_criteria', {}).items()])
+                st.session_state.evaluation_criteria = format_criteria_for_input(generated_data.get('evaluation_criteria', {}))
                 st.session_state.prompt = generated_data.get('prompt', '')
                 st.success("자동 생성이 완료되었습니다. 아래 내용을 확인하고 수정할 수 있습니다.")
 
@@ -3,6 +3,9 @@ import os
 import json
 import pandas as pd
 import base64
+from core.evaluations import CSV_PATH, load_evaluation_details, filter_applicants, load_evaluation_summaries, paginate_applicants
+from core.fs import file_signature
+from core.pdf_store import load_resume_pdf
 
 st.set_page_config(layout="wide")
 st.title("채용 공고별 지원자 보기")
@@ -21,10 +24,28 @@ def get_job_postings():
                 postings[job_data['id']] = job_data['title']
     return postings
 
-def show_pdf(file_path):
+@st.cache_data(max_entries=1)
+def _load_summaries(signature):
+    return load_evaluation_summaries()
+
+def get_evaluation_summaries():
+    return _load_summaries(file_signature(CSV_PATH))
+
+@st.cache_data(max_entries=5)
+def _load_details(submission_ids, signature):
+    return load_evaluation_details(list(submission_ids))
+
+def get_evaluation_details(submission_ids):
+    return _load_details(tuple(submission_ids), file_signature(CSV_PATH))
+
+@st.cache_data(max_entries=10)
+def _load_resume_pdf(pdf_blobs, pdf_path):
+    # Blobs are content-addressed, so the references alone identify the merged/decompressed bytes.
+    return load_resume_pdf({'pdf_blobs': pdf_blobs, 'pdf_path': pdf_path})
+
+def show_pdf(pdf_bytes):
     """Displays a PDF file in an iframe with specific view settings."""
-    with open(file_path, "rb") as f:
-        base64_pdf = base64.b64encode(f.read()).decode('utf-8')
+    base64_pdf = base64.b64encode(pdf_bytes).decode('utf-8')
     # Add parameters to the src URL to control the viewer
     # view=FitH: Fit horizontally (width)
     # pagemode=none: Hide side panels (thumbnails, bookmarks, etc.)
@@ -42,51 +63,67 @@ selected_job_id = st.selectbox("확인할 채용 공고를 선택하세요", opt
 
 st.markdown("--- ")
 
-csv_path = os.path.join('data', 'csv', 'resume_evaluations.csv')
+SORT_OPTIONS = {
+    'total_score': "총점",
+    'submission_date': "제출일",
+    'applicant_name': "지원자명",
+}
 
-if os.path.exists(csv_path) and selected_job_id:
+if os.path.exists(CSV_PATH) and selected_job_id:
     try:
-        df_all = pd.read_csv(csv_path)
-        df_filtered = df_all[df_all['job_id'] == selected_job_id].copy()
+        summaries = get_evaluation_summaries()
 
-        if df_filtered.empty:
+        if not (summaries['job_id'] == selected_job_id).any():
             st.info("해당 채용 공고에 등록된 지원자가 없습니다.")
         else:
             st.header("2. 지원자 목록")
+
+            col1, col2, col3, col4 = st.columns([0.35, 0.2, 0.25, 0.2])
+            name_query = col1.text_input("지원자명 검색")
+            min_score = col2.number_input("최소 총점", min_value=0, max_value=200, value=0, step=10)
+            sort_by = col3.selectbox("정렬 기준", options=list(SORT_OPTIONS.keys()), format_func=lambda x: SORT_OPTIONS[x])
+            ascending = col4.radio("정렬 순서", options=[False, True], format_func=lambda x: "오름차순" if x else "내림차순", horizontal=True)
+
+            page_size = 20
+            df_filtered = filter_applicants(summaries, selected_job_id, name_query, min_score or None)
+            total_count = len(df_filtered)
+            num_pages = max(1, -(-total_count // page_size))
+            page = st.number_input(f"페이지 (총 {num_pages}쪽, {total_count}명)", min_value=1, max_value=num_pages, value=1, step=1)
+
+            df_page = paginate_applicants(df_filtered, sort_by=sort_by, ascending=ascending, page=page, page_size=page_size)
+
             st.write("상세보기를 원하는 지원자를 선택하세요.")
 
             # Add a 'select' column for the data_editor
-            df_filtered['select'] = False
-            
-            # Reorder columns to have 'select' first
-            cols = ['select'] + [col for col in df_filtered.columns if col != 'select']
-            df_display = df_filtered[cols]
+            df_page.insert(0, 'select', False)
 
             # Use st.data_editor to create an interactive table
             edited_df = st.data_editor(
-                df_display,
+                df_page,
                 hide_index=True,
                 column_config={
                     "select": st.column_config.CheckboxColumn("상세보기", default=False),
+                    "submission_id": None,
+                    "job_id": None,
                     "applicant_name": "지원자명",
                     "total_score": "총점",
-                    "strengths": "강점",
-                    "weaknesses": "약점",
+                    "submission_date": st.column_config.DatetimeColumn("제출일", format="YYYY-MM-DD HH:mm"),
                 },
                 # Disable editing for all columns except 'select'
-                disabled=[col for col in df_filtered.columns if col != 'select']
+                disabled=[col for col in df_page.columns if col != 'select'],
+                key=f"applicants_{selected_job_id}_{page}",
             )
 
-            # Find the selected applicants
-            selected_applicants = edited_df[edited_df['select']]
+            # Find the selected applicants; their long text columns are loaded only now.
+            selected_ids = edited_df.loc[edited_df['select'], 'submission_id'].tolist()
 
             st.markdown("--- ")
             st.header("3. 지원자별 상세 평가 결과")
 
-            if selected_applicants.empty:
+            if not selected_ids:
                 st.info("상세보기를 원하는 지원자를 위 표에서 선택해주세요.")
             else:
-                for _, row in selected_applicants.iterrows():
+                for row in get_evaluation_details(selected_ids):
                     with st.container(border=True):
                         st.subheader(f"{row['applicant_name']} (총점: {row['total_score']})")
                         
@@ -111,17 +148,17 @@ if os.path.exists(csv_path) and selected_job_id:
                                 st.markdown(f"{i+1}. {q}")
                         
                         st.subheader("📄 이력서 원본")
-                        pdf_path = row['pdf_path']
-                        if os.path.exists(pdf_path):
-                            with open(pdf_path, "rb") as f:
-                                st.download_button(
-                                    label="이력서 PDF 다운로드",
-                                    data=f.read(),
-                                    file_name=os.path.basename(pdf_path),
-                                    mime="application/pdf"
-                                )
+                        pdf_bytes = _load_resume_pdf(row.get('pdf_blobs'), row.get('pdf_path'))
+                        if pdf_bytes:
+                            st.download_button(
+                                label="이력서 PDF 다운로드",
+                                data=pdf_bytes,
+                                file_name=f"{row['applicant_name']}.pdf",
+                                mime="application/pdf",
+                                key=f"download_{row['submission_id']}"
+                            )
                             # Display the PDF viewer
-                            show_pdf(pdf_path)
+                            show_pdf(pdf_bytes)
                         else:
                             st.warning("이력서 PDF 파일을 찾을 수 없습니다.")
                         
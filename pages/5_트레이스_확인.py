@@ -0,0 +1,83 @@
+import streamlit as st
+import pandas as pd
+import altair as alt
+from core import tracing
+from core.fs import file_signature
+
+st.set_page_config(layout="wide")
+st.title("제출 처리 트레이스")
+
+if not tracing.TRACE_ENABLED:
+    st.info("트레이싱이 꺼져 있습니다. 환경 변수 TRACE_ENABLED=1 로 Streamlit과 워커를 실행하면 단계별 소요 시간이 기록됩니다.")
+
+# --- Utility Functions ---
+@st.cache_data(max_entries=1)
+def _load_traces(signature):
+    df = pd.DataFrame(tracing.load_traces())
+    if not df.empty:
+        df['start'] = pd.to_datetime(df['start'], unit='s')
+        df['end'] = df['start'] + pd.to_timedelta(df['duration_ms'], unit='ms')
+    return df
+
+def get_traces():
+    signature = (file_signature(tracing.TRACE_PATH), file_signature(tracing.ROTATED_TRACE_PATH))
+    if signature == (None, None):
+        return pd.DataFrame()
+    return _load_traces(signature)
+
+# --- Page Logic ---
+df_traces = get_traces()
+if df_traces.empty:
+    st.warning(f"기록된 트레이스가 없습니다. ({tracing.TRACE_PATH})")
+    st.stop()
+
+st.header("1. 단계별 소요 시간 집계")
+stage_stats = df_traces.groupby('name')['duration_ms'].agg(
+    count='count',
+    mean='mean',
+    p50='median',
+    p95=lambda durations: durations.quantile(0.95),
+    max='max',
+).sort_values('mean', ascending=False)
+st.dataframe(
+    stage_stats.round(1),
+    column_config={
+        "name": "단계",
+        "count": "횟수",
+        "mean": "평균 (ms)",
+        "p50": "중앙값 (ms)",
+        "p95": "p95 (ms)",
+        "max": "최대 (ms)",
+    },
+)
+
+st.markdown("--- ")
+st.header("2. 제출별 워터폴")
+submissions = (
+    df_traces.dropna(subset=['submission_id'])
+    .groupby('submission_id')['start'].min()
+    .sort_values(ascending=False)
+)
+if submissions.empty:
+    st.info("submission_id가 기록된 트레이스가 없습니다.")
+    st.stop()
+
+selected_submission = st.selectbox(
+    "제출 선택",
+    options=list(submissions.index),
+    format_func=lambda x: f"{submissions[x]:%Y-%m-%d %H:%M:%S} · {x}",
+)
+
+df_submission = df_traces[df_traces['submission_id'] == selected_submission].sort_values('start')
+total_ms = (df_submission['end'].max() - df_submission['start'].min()).total_seconds() * 1000
+st.metric("전체 소요 시간", f"{total_ms / 1000:.2f} 초")
+
+waterfall = alt.Chart(df_submission).mark_bar().encode(
+    x=alt.X('start:T', title="시각"),
+    x2='end:T',
+    y=alt.Y('name:N', sort=None, title="단계"),
+    color=alt.Color('name:N', legend=None),
+    tooltip=['name', alt.Tooltip('duration_ms:Q', format='.1f'), 'pid'],
+)
+st.altair_chart(waterfall, use_container_width=True)
+st.dataframe(df_submission[['name', 'start', 'duration_ms', 'pid']], hide_index=True)
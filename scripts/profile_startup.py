@@ -0,0 +1,121 @@
+"""Measures import-time and per-rerun overhead of the Streamlit pages.
+
+Every measurement runs in a fresh interpreter so results do not depend on what an earlier
+measurement already imported. Run it from anywhere; it switches to the repository root.
+
+Usage:
+    python scripts/profile_startup.py [--repeat 5] [--reruns 5] [--json results.json]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'streamlit',
+    'pandas',
+    'pypdf',
+    'google.generativeai',
+    'openai',
+    'core.llm',
+    'core.postings',
+    'core.evaluations',
+    'core.pdf_store',
+]
+
+PAGES = ['main.py'] + sorted(os.path.join('pages', name) for name in os.listdir(os.path.join(ROOT_DIR, 'pages')) if name.endswith('.py'))
+
+IMPORT_SNIPPET = """
+import time, json, sys
+start = time.perf_counter()
+try:
+    __import__({module!r})
+except ImportError:
+    print(json.dumps(None))
+    sys.exit(0)
+print(json.dumps(time.perf_counter() - start))
+"""
+
+PAGE_SNIPPET = """
+import time, json
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({page!r}, default_timeout=60)
+at.run()
+cold = time.perf_counter() - start
+reruns = []
+for _ in range({reruns}):
+    start = time.perf_counter()
+    at.run()
+    reruns.append(time.perf_counter() - start)
+print(json.dumps({{"cold": cold, "reruns": reruns, "exception": bool(at.exception)}}))
+"""
+
+
+def _run_snippet(code):
+    # Dummy credentials let the LLM pages render; no API call is made while rendering.
+    env = dict(os.environ)
+    env.setdefault("LLM_PROVIDER", "GEMINI")
+    env.setdefault("GOOGLE_API_KEY", "profile-dummy-key")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def profile_imports(repeat):
+    results = {}
+    for module in MODULES:
+        samples = [_run_snippet(IMPORT_SNIPPET.format(module=module)) for _ in range(repeat)]
+        results[module] = None if None in samples else statistics.median(samples)
+    return results
+
+
+def profile_pages(repeat, reruns):
+    results = {}
+    for page in PAGES:
+        try:
+            samples = [_run_snippet(PAGE_SNIPPET.format(page=page, reruns=reruns)) for _ in range(repeat)]
+        except RuntimeError as e:
+            results[page] = {"error": str(e)}
+            continue
+        results[page] = {
+            "cold": statistics.median(sample["cold"] for sample in samples),
+            "rerun": statistics.median(t for sample in samples for t in sample["reruns"]),
+            "exception": any(sample["exception"] for sample in samples),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamlit 페이지 import/rerun 시간 측정")
+    parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--reruns", type=int, default=5, help="페이지당 rerun 측정 횟수")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    imports = profile_imports(args.repeat)
+    print("== import 시간 (중앙값) ==")
+    for module, seconds in imports.items():
+        print(f"{module:<24} {'미설치' if seconds is None else f'{seconds * 1000:8.1f} ms'}")
+
+    pages = profile_pages(args.repeat, args.reruns)
+    print("\n== 페이지 실행 시간 (중앙값) ==")
+    for page, result in pages.items():
+        if "error" in result:
+            print(f"{page:<32} 측정 실패: {result['error']}")
+            continue
+        note = " (페이지 예외 발생)" if result["exception"] else ""
+        print(f"{page:<32} 최초 {result['cold'] * 1000:8.1f} ms / rerun {result['rerun'] * 1000:8.1f} ms{note}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"imports": imports, "pages": pages}, f, ensure_ascii=False, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Background worker that evaluates queued resume submissions.
+
+Streamlit pages only enqueue work (see core/task_queue.py) and poll its status, so reruns
+or closed tabs never interrupt an evaluation. PDF storage/extraction runs in a process pool
+to use every CPU core (--processes), and LLM calls run as concurrent asyncio tasks bounded
+separately (--concurrency). At most processes + concurrency tasks are claimed at once.
+
+Only one worker may run at a time: it holds an exclusive lock on data/worker.lock, and a second
+worker exits immediately. Requeuing 'running' tasks at startup and the in-process CSV lock both
+rely on that.
+
+Usage:
+    python worker.py [--concurrency 4] [--processes N] [--poll-interval 1.0]
+"""
+import os
+import json
+import shutil
+import asyncio
+import uuid
+import argparse
+import logging
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from core import task_queue, tracing
+from core.evaluations import append_evaluation, build_evaluation_record
+from core.llm import EVALUATION_MODE_AUTO, get_llm_provider
+from core.postings import JOB_POSTINGS_DIR
+from core.resume import prepare_resume
+
+logger = logging.getLogger("worker")
+
+# Lossless recompression of stored PDFs trades some CPU per submission for disk space.
+RECOMPRESS_PDFS = os.environ.get("PDF_RECOMPRESS", "").lower() in ("1", "true", "yes")
+
+
+HEARTBEAT_INTERVAL = 10
+WORKER_LOCK_PATH = os.path.join('data', 'worker.lock')
+
+
+class TaskError(Exception):
+    """A task failed for a reason that should be shown to the user as-is."""
+
+
+class PdfPool:
+    """Process pool for PDF work that is rebuilt when a child process dies (OOM, native crash in pypdf)."""
+
+    def __init__(self, processes):
+        self.processes = processes
+        self._executor = ProcessPoolExecutor(max_workers=processes)
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._executor
+            try:
+                return await loop.run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                # Every task running in the dead pool lands here; only the first one rebuilds it.
+                if executor is self._executor:
+                    logger.error("process pool broken; rebuilding")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor = ProcessPoolExecutor(max_workers=self.processes)
+                if attempt == 1:
+                    raise
+
+    def shutdown(self):
+        self._executor.shutdown(cancel_futures=True)
+
+
+async def evaluate_resume(payload, llm, pool, llm_semaphore, csv_lock):
+    submission_id = payload['submission_id']
+    try:
+        with tracing.span('pdf.prepare', file_count=len(payload['upload_paths'])):
+            blob_hashes, resume_text = await pool.run(
+                prepare_resume, payload['upload_paths'], RECOMPRESS_PDFS, submission_id, tracing.should_profile()
+            )
+    except Exception as e:
+        raise TaskError(f"PDF 파일 처리 중 오류가 발생했습니다: {e}")
+    if not resume_text.strip():
+        raise TaskError("PDF에서 텍스트를 추출하지 못했습니다. 텍스트 기반의 PDF인지 확인해주세요.")
+
+    with tracing.span('job.load'):
+        job_details_path = os.path.join(JOB_POSTINGS_DIR, f"{payload['job_id']}.json")
+        with open(job_details_path, 'r', encoding='utf-8') as f:
+            job_details = json.load(f)
+
+    # llm_semaphore is taken per request, so long-document map calls count against --concurrency too.
+    evaluation_result = await llm.evaluate_resume_async(
+        job_details, resume_text, payload.get('evaluation_mode', EVALUATION_MODE_AUTO), semaphore=llm_semaphore
+    )
+
+    # The CSV is rewritten as a whole, so writes from concurrent tasks must not interleave.
+    with tracing.span('csv.lock_wait'):
+        await csv_lock.acquire()
+    try:
+        with tracing.span('csv.write'):
+            await asyncio.to_thread(append_evaluation, build_evaluation_record(payload, evaluation_result, blob_hashes))
+    finally:
+        csv_lock.release()
+
+    return evaluation_result
+
+
+def acquire_worker_lock(path=WORKER_LOCK_PATH):
+    """Takes an exclusive lock for the life of the process, or returns None if another worker holds it.
+
+    Keep a reference to the returned file; the OS releases the lock when the process exits, even on a crash.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    lock_file = open(path, 'a+')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def remove_uploads(payload):
+    """Deletes the temporary upload directory; the PDFs themselves live in the blob store by now."""
+    if payload.get('upload_paths'):
+        shutil.rmtree(os.path.dirname(payload['upload_paths'][0]), ignore_errors=True)
+
+
+async def handle_task(task, llm, pool, llm_semaphore, csv_lock, claim_slots):
+    with tracing.submission_context(task['id']):
+        try:
+            try:
+                if tracing.TRACE_ENABLED:
+                    created_at = datetime.fromisoformat(task['created_at']).timestamp()
+                    tracing.record_span('queue.wait', created_at, (datetime.now().timestamp() - created_at) * 1000)
+                if task['kind'] != task_queue.TASK_EVALUATE_RESUME:
+                    raise TaskError(f"알 수 없는 작업 유형입니다: {task['kind']}")
+                with tracing.span('task.total'):
+                    result = await evaluate_resume(task['payload'], llm, pool, llm_semaphore, csv_lock)
+                await asyncio.to_thread(task_queue.complete, task['id'], result)
+                logger.info("task %s done", task['id'])
+            except Exception as e:
+                logger.exception("task %s failed", task['id'])
+                await asyncio.to_thread(task_queue.fail, task['id'], e)
+            # Only reached once the task is recorded as done or failed. A task cancelled by a worker
+            # shutdown (CancelledError) stays 'running' and keeps its uploads so the requeue can rerun it.
+            remove_uploads(task['payload'])
+        finally:
+            claim_slots.release()
+
+
+async def send_heartbeats(worker_id):
+    while True:
+        try:
+            await asyncio.to_thread(task_queue.heartbeat, worker_id)
+        except Exception:
+            logger.exception("failed to record heartbeat")
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+
+async def run(concurrency, processes, poll_interval):
+    llm = get_llm_provider()
+    if llm.error_messages:
+        for msg in llm.error_messages:
+            logger.error(msg)
+        raise SystemExit(1)
+
+    requeued, exhausted = task_queue.requeue_running()
+    if requeued:
+        logger.info("requeued %d interrupted task(s)", requeued)
+    for task in exhausted:
+        logger.error("task %s failed after %d attempts", task['id'], task['attempts'])
+        remove_uploads(task['payload'])
+
+    processes = processes or os.cpu_count() or 1
+    # Claiming is bounded by both stages together so the pool stays busy while other tasks wait on the LLM.
+    claim_slots = asyncio.Semaphore(processes + concurrency)
+    llm_semaphore = asyncio.Semaphore(concurrency)
+    csv_lock = asyncio.Lock()
+    running = set()
+    logger.info("worker started (provider=%s, concurrency=%d, processes=%d)", llm.name, concurrency, processes)
+
+    heartbeat_job = asyncio.create_task(send_heartbeats(str(uuid.uuid4())))
+    pool = PdfPool(processes)
+    try:
+        while True:
+            await claim_slots.acquire()
+            try:
+                task = await asyncio.to_thread(task_queue.claim_next)
+            except Exception:
+                # e.g. sqlite3.OperationalError when the queue DB stays locked; keep polling.
+                logger.exception("failed to claim a task")
+                task = None
+            if task is None:
+                claim_slots.release()
+                await asyncio.sleep(poll_interval)
+                continue
+            logger.info("task %s claimed (%s)", task['id'], task['kind'])
+            job = asyncio.create_task(handle_task(task, llm, pool, llm_semaphore, csv_lock, claim_slots))
+            running.add(job)
+            job.add_done_callback(running.discard)
+    finally:
+        heartbeat_job.cancel()
+        pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이력서 평가 백그라운드 워커")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 진행할 LLM 호출 수 (긴 문서 모드의 구간별 호출 포함, 모든 작업 합계)")
+    parser.add_argument("--processes", type=int, default=None, help="PDF 처리 프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="대기열 확인 주기(초)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    lock_file = acquire_worker_lock()
+    if lock_file is None:
+        logger.error("another worker is already running (%s is locked)", WORKER_LOCK_PATH)
+        raise SystemExit(1)
+    try:
+        asyncio.run(run(args.concurrency, args.processes, args.poll_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()